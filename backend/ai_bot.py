@@ -13,6 +13,8 @@ from google import genai
 import aiohttp
 from datetime import datetime
 
+from model_router import ModelRouter
+
 load_dotenv()
 
 class AIAssistantBot:
@@ -38,6 +40,7 @@ class AIAssistantBot:
         self.channel = None
         self.meeting_context = []
         self.gemini_client = None
+        self.model_router = None
         self.is_running = False
         
         self._validate_config()
@@ -80,6 +83,7 @@ class AIAssistantBot:
             
             # Initialize Gemini AI
             self.gemini_client = genai.Client(api_key=self.gemini_api_key)
+            self.model_router = ModelRouter(self.gemini_client)
             print("✅ Gemini AI initialized")
             
             # Get or create channel for the call
@@ -188,12 +192,7 @@ Current message from {sender_name}: {user_message}
 Provide a helpful, concise response (2-3 sentences). Be friendly and professional."""
 
             # Generate response with Gemini
-            response = self.gemini_client.models.generate_content(
-                model='gemini-2.0-flash-exp',
-                contents=prompt
-            )
-            
-            ai_response = response.text.strip()
+            ai_response = self.model_router.generate(prompt, task='chat').strip()
             
             # Send response to chat
             self.channel.send_message(
@@ -243,12 +242,7 @@ Provide:
 
 Keep it brief and actionable."""
 
-            response = self.gemini_client.models.generate_content(
-                model='gemini-2.0-flash-exp',
-                contents=prompt
-            )
-            
-            summary = response.text.strip()
+            summary = self.model_router.generate(prompt, task='summary').strip()
             
             # Send summary to chat
             self.channel.send_message(
@@ -29,8 +29,41 @@ class Config:
     SAMPLE_RATE = 16000  # Hz - required for most speech-to-text services
     AUDIO_CHUNK_DURATION = 1  # seconds
     
-    # Gemini model
-    GEMINI_MODEL = 'gemini-2.0-flash-exp'
+    # Shared state settings
+    STATE_BACKEND = os.getenv('STATE_BACKEND', 'memory')  # 'memory' (single worker) or 'redis'
+    REDIS_URLS = [url.strip() for url in os.getenv('REDIS_URLS', 'redis://localhost:6379/0').split(',') if url.strip()]  # One per shard
+    STATE_TTL = 24 * 60 * 60  # seconds - meeting state expires a day after the last write
+    STATE_CACHE_SIZE = 1000  # Meetings kept in each worker's local context cache
+    STATE_MAX_MEETINGS = 10000  # Meetings kept by the in-memory backend
+    
+    # Event push (SSE) settings
+    EVENT_SUBSCRIBER_BUFFER = int(os.getenv('EVENT_SUBSCRIBER_BUFFER', 256))  # Events buffered per subscriber before it is dropped
+    EVENT_REPLAY_SIZE = int(os.getenv('EVENT_REPLAY_SIZE', 100))  # Recent events kept per meeting for reconnects
+    EVENT_HEARTBEAT_SECONDS = 15
+    EVENT_MAX_MEETINGS = int(os.getenv('EVENT_MAX_MEETINGS', 1000))  # Meetings with replay history kept in memory
+    EVENT_IDLE_SECONDS = 60 * 60  # Replay history of a meeting with no subscribers is dropped after this
+    MAX_TRANSCRIPT_CHARS = 2000  # Longest transcript line accepted by the API
+    
+    # Gemini models
+    GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash-exp')
+    GEMINI_FAST_MODEL = os.getenv('GEMINI_FAST_MODEL', 'gemini-2.0-flash-lite')
+    
+    # Model routing: task -> (primary tier, fallback tier)
+    MODEL_ROUTES = {
+        'chat': ('fast', 'standard'),      # Short Q&A replies
+        'summary': ('standard', 'fast'),   # Full meeting summaries
+    }
+    MODEL_DEADLINES = {  # seconds
+        'chat': 15,
+        'summary': 45,
+    }
+    MODEL_DEFAULT_DEADLINE = 30  # seconds
+    MODEL_HEDGE_PERCENTILE = 95  # Hedge once the primary exceeds this latency percentile
+    MODEL_HEDGE_DEFAULT_DELAY = 3  # seconds - used until enough latency samples exist
+    MODEL_HEDGE_MAX_FRACTION = 0.5  # Hedge no later than this fraction of the deadline
+    MODEL_LATENCY_WINDOW = 200  # Samples kept per (model, task, mode)
+    MODEL_LATENCY_MIN_SAMPLES = 20
+    MODEL_ROUTER_WORKERS = 8  # Per pool - primary and hedged calls use separate pools
     
     @classmethod
     def validate(cls):
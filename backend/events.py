@@ -0,0 +1,370 @@
+"""
+Per-meeting event hub for pushing updates to the frontend over Server-Sent Events
+"""
+
+import itertools
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+
+from config import Config
+
+try:
+    import redis
+except ImportError:  # Only needed for STATE_BACKEND=redis
+    redis = None
+
+
+class Subscription:
+    """
+    A single subscriber (one open SSE connection) with its own bounded buffer
+    """
+
+    def __init__(self, meeting_id, max_buffer):
+        self.meeting_id = meeting_id
+        self.max_buffer = max_buffer
+        self.closed = False
+        self.overflowed = False
+        self._buffer = deque()
+        # Live events are held back until the replay backlog has been merged in,
+        # so a reconnecting client sees events in id order
+        self._held = []
+        self._cond = threading.Condition()
+
+    def put(self, event):
+        """
+        Queue an event for this subscriber.
+        A consumer whose buffer is full is cut off instead of blocking the publisher;
+        the browser's EventSource reconnects and resumes from its Last-Event-ID.
+        """
+        with self._cond:
+            if self.closed:
+                return False
+
+            pending = self._buffer if self._held is None else self._held
+            if len(pending) >= self.max_buffer:
+                self.overflowed = True
+                self.closed = True
+                self._buffer.clear()
+                self._held = None
+                self._cond.notify_all()
+                return False
+
+            pending.append(event)
+            self._cond.notify()
+            return True
+
+    def release(self, backlog=()):
+        """Start delivering: replayed backlog first, then any live events held meanwhile"""
+        with self._cond:
+            if self._held is None:
+                return
+
+            events = {event['id']: event for event in list(backlog) + self._held}
+            self._held = None
+            self._buffer.extend(events[event_id] for event_id in sorted(events)[-self.max_buffer:])
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """Wait for the next event; returns None on timeout or when closed"""
+        with self._cond:
+            if not self._buffer and not self.closed:
+                self._cond.wait(timeout)
+
+            if self._buffer:
+                return self._buffer.popleft()
+
+            return None
+
+    def close(self):
+        """Stop accepting events and wake up any waiting reader"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class EventHub:
+    """
+    Fans out meeting events (transcript lines, assistant tokens, summaries) to subscribers
+    connected to this process
+    """
+
+    def __init__(self, max_buffer=None, replay_size=None, max_meetings=None, idle_seconds=None):
+        self.max_buffer = max_buffer or Config.EVENT_SUBSCRIBER_BUFFER
+        # Replaying more than a subscriber can buffer would drop it straight away,
+        # and the client would reconnect with the same Last-Event-ID forever
+        self.replay_size = min(replay_size or Config.EVENT_REPLAY_SIZE, self.max_buffer)
+        self.max_meetings = max_meetings or Config.EVENT_MAX_MEETINGS
+        self.idle_seconds = idle_seconds or Config.EVENT_IDLE_SECONDS
+        self._subscribers = {}       # meeting_id -> set of Subscription
+        self._history = OrderedDict()  # meeting_id -> (last publish time, deque of recent events), oldest first
+        # One process-wide counter keeps ids increasing even after a meeting's history is evicted
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subscribe(self, meeting_id, last_event_id=None):
+        """
+        Register a new subscriber for a meeting.
+        If last_event_id is given, events missed since then are replayed first.
+        """
+        subscription = Subscription(meeting_id, self.max_buffer)
+
+        with self._lock:
+            first = meeting_id not in self._subscribers
+            self._subscribers.setdefault(meeting_id, set()).add(subscription)
+
+        if first:
+            self._watch(meeting_id)
+
+        backlog = self._replay(meeting_id, last_event_id) if last_event_id is not None else ()
+        subscription.release(backlog)
+
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a subscriber and release its buffer"""
+        subscription.close()
+
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.meeting_id)
+            if subscribers is None or subscription not in subscribers:
+                return
+
+            subscribers.discard(subscription)
+            last = not subscribers
+            if last:
+                del self._subscribers[subscription.meeting_id]
+
+        if last:
+            self._unwatch(subscription.meeting_id)
+
+    def publish(self, meeting_id, event_type, data, replay=True):
+        """
+        Publish an event to every subscriber of a meeting.
+        Returns the number of subscribers the event was delivered to.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            event = {'id': next(self._ids), 'type': event_type, 'data': data}
+
+            if replay:
+                _, history = self._history.pop(meeting_id, (None, None))
+                if history is None:
+                    history = deque(maxlen=self.replay_size)
+                history.append(event)
+                self._history[meeting_id] = (now, history)
+                self._evict_history(now)
+
+        return self._deliver(meeting_id, event)
+
+    def _deliver(self, meeting_id, event):
+        """Hand an event to this process's subscribers of a meeting"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(meeting_id, ()))
+
+        delivered = 0
+        for subscription in subscribers:
+            if subscription.put(event):
+                delivered += 1
+            elif subscription.overflowed:
+                print(f"⚠️  Dropping slow event subscriber for meeting {meeting_id}")
+                self.unsubscribe(subscription)
+
+        return delivered
+
+    def _replay(self, meeting_id, last_event_id):
+        """Recent replayable events newer than last_event_id"""
+        with self._lock:
+            _, history = self._history.get(meeting_id, (None, ()))
+            return [event for event in history if event['id'] > last_event_id]
+
+    def _watch(self, meeting_id):
+        """Called when a meeting gets its first local subscriber"""
+
+    def _unwatch(self, meeting_id):
+        """Called when a meeting loses its last local subscriber"""
+
+    def _evict_history(self, now):
+        """
+        Drop replay history for meetings nobody is watching once they go idle, and
+        for the least recently active ones beyond max_meetings. Caller holds the lock.
+        """
+        for meeting_id in list(self._history):
+            last_active, _ = self._history[meeting_id]
+            over_limit = len(self._history) > self.max_meetings
+            idle = now - last_active > self.idle_seconds
+
+            if not over_limit and not idle:
+                break  # Everything after this was active more recently
+            if meeting_id in self._subscribers and not over_limit:
+                continue
+
+            del self._history[meeting_id]
+
+    def tracked_meetings(self):
+        """Number of meetings with replay history held in memory"""
+        with self._lock:
+            return len(self._history)
+
+    def subscriber_count(self, meeting_id):
+        """Number of open subscriptions for a meeting"""
+        with self._lock:
+            return len(self._subscribers.get(meeting_id, ()))
+
+
+class RedisEventHub(EventHub):
+    """
+    Event hub shared by every worker through Redis.
+
+    Events are published on a per-meeting pub/sub channel, and each worker only
+    subscribes to the channels of meetings it has local SSE subscribers for. Event ids
+    come from a per-meeting Redis counter and replay history is a capped Redis list,
+    so Last-Event-ID works no matter which worker a client reconnects to.
+    Meetings are sharded across REDIS_URLS the same way as the state backend.
+    """
+
+    def __init__(self, urls=None, clients=None, max_buffer=None, replay_size=None, ttl=None):
+        super().__init__(max_buffer=max_buffer, replay_size=replay_size)
+
+        if clients is None:
+            if redis is None:
+                raise ValueError("STATE_BACKEND=redis requires the 'redis' package (pip install redis)")
+            clients = [
+                redis.Redis.from_url(url, decode_responses=True)
+                for url in (urls or Config.REDIS_URLS)
+            ]
+
+        if not clients:
+            raise ValueError("At least one Redis URL is required for the Redis event hub")
+
+        self.clients = clients
+        self.ttl = ttl or Config.STATE_TTL
+        self._pubsubs = {}   # shard index -> (PubSub, listener thread)
+        self._watch_lock = threading.Lock()
+
+    def _shard_index(self, meeting_id):
+        return zlib.crc32(meeting_id.encode('utf-8')) % len(self.clients)
+
+    @staticmethod
+    def _channel(meeting_id):
+        return f"meeting:{{{meeting_id}}}:events"
+
+    @staticmethod
+    def _id_key(meeting_id):
+        return f"meeting:{{{meeting_id}}}:event_id"
+
+    @staticmethod
+    def _history_key(meeting_id):
+        return f"meeting:{{{meeting_id}}}:event_history"
+
+    def _next_id(self, client, meeting_id):
+        """
+        Allocate a shared event id. A new counter starts from the current time in
+        microseconds, so ids keep increasing even after an idle meeting's counter expired.
+        """
+        key = self._id_key(meeting_id)
+
+        pipe = client.pipeline(transaction=True)
+        pipe.set(key, int(time.time() * 1_000_000), nx=True, ex=self.ttl)
+        pipe.incr(key)
+        pipe.expire(key, self.ttl)
+        return int(pipe.execute()[1])
+
+    def publish(self, meeting_id, event_type, data, replay=True):
+        """
+        Publish an event to every worker subscribed to the meeting.
+        Returns the number of workers that received it.
+        """
+        client = self.clients[self._shard_index(meeting_id)]
+        event = {'id': self._next_id(client, meeting_id), 'type': event_type, 'data': data}
+        payload = json.dumps(event)
+
+        pipe = client.pipeline(transaction=False)
+        if replay:
+            history_key = self._history_key(meeting_id)
+            pipe.rpush(history_key, payload)
+            pipe.ltrim(history_key, -self.replay_size, -1)
+            pipe.expire(history_key, self.ttl)
+        pipe.publish(self._channel(meeting_id), payload)
+
+        return int(pipe.execute()[-1])
+
+    def _replay(self, meeting_id, last_event_id):
+        client = self.clients[self._shard_index(meeting_id)]
+        events = [json.loads(value) for value in client.lrange(self._history_key(meeting_id), 0, -1)]
+        return [event for event in events if event['id'] > last_event_id]
+
+    def _handler(self, meeting_id):
+        def handle(message):
+            self._deliver(meeting_id, json.loads(message['data']))
+        return handle
+
+    def _watch(self, meeting_id):
+        with self._watch_lock:
+            # Subscriber may already be gone again by the time we get here
+            if not self.subscriber_count(meeting_id):
+                return
+
+            index = self._shard_index(meeting_id)
+            if index not in self._pubsubs:
+                pubsub = self.clients[index].pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{self._channel(meeting_id): self._handler(meeting_id)})
+                thread = pubsub.run_in_thread(sleep_time=0.1, daemon=True)
+                self._pubsubs[index] = (pubsub, thread)
+            else:
+                pubsub, _ = self._pubsubs[index]
+                pubsub.subscribe(**{self._channel(meeting_id): self._handler(meeting_id)})
+
+    def _unwatch(self, meeting_id):
+        with self._watch_lock:
+            if self.subscriber_count(meeting_id):
+                return
+
+            entry = self._pubsubs.get(self._shard_index(meeting_id))
+            if entry is not None:
+                entry[0].unsubscribe(self._channel(meeting_id))
+
+
+def create_event_hub(name=None):
+    """Build the event hub matching STATE_BACKEND"""
+    name = (name or Config.STATE_BACKEND).lower()
+
+    if name == 'redis':
+        return RedisEventHub()
+
+    return EventHub()
+
+
+def format_sse(event):
+    """Serialize an event in text/event-stream wire format"""
+    payload = json.dumps(event['data'])
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+
+def stream_events(hub, subscription, heartbeat=None):
+    """
+    Generator yielding SSE frames for a subscription until the client goes away
+    or the subscriber is dropped for being too slow
+    """
+    heartbeat = heartbeat or Config.EVENT_HEARTBEAT_SECONDS
+
+    try:
+        # Tell EventSource how long to wait before reconnecting
+        yield "retry: 2000\n\n"
+
+        while not subscription.closed:
+            event = subscription.get(timeout=heartbeat)
+
+            if event is None:
+                if subscription.closed:
+                    break
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+
+            yield format_sse(event)
+    finally:
+        hub.unsubscribe(subscription)
@@ -9,6 +9,8 @@ import asyncio
 from dotenv import load_dotenv
 from google import genai
 
+from model_router import ModelRouter
+
 load_dotenv()
 
 class MeetingAssistant:
@@ -17,11 +19,13 @@ class MeetingAssistant:
         self.call_id = os.getenv('CALL_ID', 'demo-meeting')
         self.meeting_context = []
         self.model = None
+        self.model_router = None
         
     async def initialize(self):
         """Initialize Gemini AI"""
         try:
             self.model = genai.Client(api_key=self.gemini_api_key)
+            self.model_router = ModelRouter(self.model)
             print("✅ Gemini AI initialized successfully\n")
         except Exception as e:
             print(f"❌ Failed to initialize Gemini: {e}")
@@ -99,10 +103,7 @@ Response:"""
             # Get response
             response = await asyncio.get_event_loop().run_in_executor(
                 None,
-                lambda: self.model.models.generate_content(
-                    model='gemini-2.0-flash-exp',
-                    contents=prompt
-                ).text
+                lambda: self.model_router.generate(prompt, task='chat')
             )
             
             print(f"💬 AI Response: {response}\n")
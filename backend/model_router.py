@@ -0,0 +1,294 @@
+"""
+Latency-aware Gemini model routing with per-call deadlines and hedged requests
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import Config
+
+
+class LatencyTracker:
+    """
+    Rolling window of observed latencies per (model, task, mode).
+
+    Samples are kept apart by task and mode because they measure different things:
+    a 'stream' sample is time to first chunk, a 'generate' sample is the full call,
+    and a summary takes far longer than a short chat reply.
+    """
+
+    def __init__(self, window=None, min_samples=None):
+        self.window = window or Config.MODEL_LATENCY_WINDOW
+        self.min_samples = Config.MODEL_LATENCY_MIN_SAMPLES if min_samples is None else min_samples
+        self._samples = {}   # (model, task, mode) -> deque of seconds
+        self._errors = {}    # (model, task, mode) -> error count
+        self._lock = threading.Lock()
+
+    def record(self, key, seconds):
+        """Record a successful call duration"""
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def record_error(self, key):
+        """Record a failed call"""
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def percentile(self, key, pct):
+        """
+        Latency percentile (0-100) for a (model, task, mode) key.
+        Returns None until enough samples have been collected to be meaningful.
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+
+        if not samples or len(samples) < self.min_samples:
+            return None
+
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self):
+        """Summary of tracked latencies, for diagnostics"""
+        with self._lock:
+            keys = set(self._samples) | set(self._errors)
+            counts = {key: len(self._samples.get(key, ())) for key in keys}
+            errors = dict(self._errors)
+
+        return {
+            "/".join(key): {
+                "samples": counts[key],
+                "errors": errors.get(key, 0),
+                "p50": self.percentile(key, 50),
+                "p95": self.percentile(key, 95),
+                "p99": self.percentile(key, 99),
+            }
+            for key in sorted(keys)
+        }
+
+
+def _request_config(timeout):
+    """
+    Per-request Gemini config carrying the remaining deadline, so the HTTP call itself
+    is cancelled (and its worker freed) instead of running on after we stop waiting
+    """
+    return {'http_options': {'timeout': max(1, int(timeout * 1000))}}  # milliseconds
+
+
+def _close(chunks):
+    """Close a response stream nobody is going to read"""
+    close = getattr(chunks, 'close', None)
+    if close is not None:
+        try:
+            close()
+        except Exception:
+            pass
+
+
+class ModelRouter:
+    """
+    Picks a model tier per task and hedges slow calls to a fallback model.
+
+    Each task maps to a (primary, fallback) pair of tiers. The primary is called first;
+    if it has not answered once its p95 latency has elapsed (or it fails), the same
+    request is sent to the fallback and whichever answers first wins. Every call is
+    bounded by the task's deadline.
+    """
+
+    def __init__(self, client, tiers=None, routes=None, deadlines=None, tracker=None, workers=None):
+        self.client = client
+        self.tiers = tiers or {
+            'fast': Config.GEMINI_FAST_MODEL,
+            'standard': Config.GEMINI_MODEL,
+        }
+        self.routes = routes or Config.MODEL_ROUTES
+        self.deadlines = deadlines or Config.MODEL_DEADLINES
+        self.tracker = tracker or LatencyTracker()
+
+        # Hedged requests get their own pool so they never queue behind the hung
+        # primaries they are meant to rescue
+        workers = workers or Config.MODEL_ROUTER_WORKERS
+        self._primary_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='model-primary')
+        self._hedge_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='model-hedge')
+
+    def route(self, task, mode='generate'):
+        """
+        Resolve the (primary, fallback) models for a task.
+        If the primary's p95 already blows the deadline while the fallback's does not,
+        the two are swapped so requests stop waiting on the slow model first.
+        """
+        primary_tier, fallback_tier = self.routes.get(task, self.routes['chat'])
+        primary = self.tiers[primary_tier]
+        fallback = self.tiers[fallback_tier] if fallback_tier else None
+
+        if fallback and fallback != primary:
+            deadline = self.deadlines.get(task, Config.MODEL_DEFAULT_DEADLINE)
+            primary_p95 = self.tracker.percentile((primary, task, mode), Config.MODEL_HEDGE_PERCENTILE)
+            fallback_p95 = self.tracker.percentile((fallback, task, mode), Config.MODEL_HEDGE_PERCENTILE)
+
+            if primary_p95 is not None and fallback_p95 is not None:
+                if primary_p95 > deadline and fallback_p95 < deadline:
+                    primary, fallback = fallback, primary
+        else:
+            fallback = None
+
+        return primary, fallback
+
+    def hedge_delay(self, model, task, mode='generate'):
+        """How long to wait on a model before sending the hedged request"""
+        p95 = self.tracker.percentile((model, task, mode), Config.MODEL_HEDGE_PERCENTILE)
+        return p95 if p95 is not None else Config.MODEL_HEDGE_DEFAULT_DELAY
+
+    def generate(self, prompt, task='chat', deadline=None):
+        """Generate a full text response for a prompt"""
+        def call(model, timeout):
+            response = self.client.models.generate_content(
+                model=model,
+                contents=prompt,
+                config=_request_config(timeout)
+            )
+            return response.text
+
+        deadline = deadline or self.deadlines.get(task, Config.MODEL_DEFAULT_DEADLINE)
+        return self._hedged(task, 'generate', call, time.monotonic() + deadline)
+
+    def stream(self, prompt, task='chat', deadline=None):
+        """
+        Stream a text response chunk by chunk.
+        Hedging is decided on time to first chunk; the deadline covers the whole stream.
+        """
+        def call(model, timeout):
+            chunks = iter(self.client.models.generate_content_stream(
+                model=model,
+                contents=prompt,
+                config=_request_config(timeout)
+            ))
+            for chunk in chunks:
+                if chunk.text:
+                    return chunk.text, chunks
+            return '', chunks
+
+        deadline = deadline or self.deadlines.get(task, Config.MODEL_DEFAULT_DEADLINE)
+        end = time.monotonic() + deadline
+
+        first, rest = self._hedged(task, 'stream', call, end, discard=lambda result: _close(result[1]))
+
+        if first:
+            yield first
+
+        # Read the remaining chunks on a helper thread so a stalled stream can't
+        # hold the caller past the deadline
+        pending = queue.Queue()
+        stop = threading.Event()
+
+        def pump():
+            try:
+                for chunk in rest:
+                    if stop.is_set():
+                        break
+                    pending.put(('chunk', chunk.text))
+                pending.put(('done', None))
+            except Exception as e:
+                pending.put(('error', e))
+            finally:
+                _close(rest)
+
+        threading.Thread(target=pump, daemon=True, name='model-stream').start()
+
+        try:
+            while True:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"{task} stream exceeded {deadline}s deadline")
+
+                try:
+                    kind, value = pending.get(timeout=remaining)
+                except queue.Empty:
+                    raise TimeoutError(f"{task} stream exceeded {deadline}s deadline")
+
+                if kind == 'done':
+                    return
+                if kind == 'error':
+                    raise value
+                if value:
+                    yield value
+        finally:
+            stop.set()
+
+    def _timed(self, call, model, key, submitted, end):
+        """Run a model call and record its latency, queue time included"""
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            # Deadline passed while queued - don't spend a worker on a dead request
+            raise TimeoutError(f"{model} call expired before it started")
+
+        try:
+            result = call(model, remaining)
+        except Exception:
+            self.tracker.record_error(key)
+            raise
+
+        self.tracker.record(key, time.monotonic() - submitted)
+        return result
+
+    def _submit(self, pool, call, model, task, mode, end):
+        key = (model, task, mode)
+        return pool.submit(self._timed, call, model, key, time.monotonic(), end)
+
+    def _hedged(self, task, mode, call, end, discard=None):
+        """
+        Run call(model) against the task's primary model, hedging to the fallback.
+        Losing or abandoned calls are left to finish in the background (their latency
+        is still recorded); if one later succeeds, its result is passed to discard().
+        """
+        primary, fallback = self.route(task, mode)
+        start = time.monotonic()
+        deadline = round(end - start, 3)
+        # Never hedge so late that the fallback has no time left to answer
+        hedge_delay = min(self.hedge_delay(primary, task, mode), (end - start) * Config.MODEL_HEDGE_MAX_FRACTION)
+        hedge_at = start + hedge_delay
+
+        pending = {self._submit(self._primary_pool, call, primary, task, mode, end): primary}
+        hedged = fallback is None
+        last_error = None
+
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= end:
+                    break
+
+                if not hedged and (last_error is not None or now >= hedge_at):
+                    pending[self._submit(self._hedge_pool, call, fallback, task, mode, end)] = fallback
+                    hedged = True
+
+                if not pending:
+                    break
+
+                timeout = end - now
+                if not hedged:
+                    timeout = min(timeout, max(0, hedge_at - now))
+
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    model = pending.pop(future)
+                    try:
+                        return future.result()
+                    except Exception as e:
+                        print(f"⚠️  Model {model} failed for {task}: {e}")
+                        last_error = e
+
+            if pending:
+                raise TimeoutError(f"{task} request exceeded {deadline}s deadline")
+
+            raise last_error
+        finally:
+            if discard is not None:
+                for future in pending:
+                    future.add_done_callback(
+                        lambda f: discard(f.result()) if not f.cancelled() and f.exception() is None else None
+                    )
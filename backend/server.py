@@ -2,13 +2,19 @@
 Flask server for AI Meeting Assistant with audio transcription
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
 from google import genai
 import base64
 import io
+import uuid
+
+from config import Config
+from events import create_event_hub, stream_events
+from model_router import ModelRouter
+from state import create_state_backend
 
 load_dotenv()
 
@@ -17,13 +23,26 @@ CORS(app)  # Enable CORS for Next.js frontend
 
 # Initialize Gemini AI
 gemini_client = genai.Client(api_key=os.getenv('GEMINI_API_KEY'))
-meeting_context = []
+model_router = ModelRouter(gemini_client)
+
+# Conversation context + summaries, shared across workers when STATE_BACKEND=redis
+state = create_state_backend()
+
+# Push channel for live meeting updates (replaces client polling),
+# fanned out through Redis pub/sub when STATE_BACKEND=redis
+event_hub = create_event_hub()
+DEFAULT_MEETING_ID = os.getenv('CALL_ID', 'demo-meeting')
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({"status": "healthy", "service": "AI Meeting Assistant"})
 
+@app.route('/api/models/latency', methods=['GET'])
+def model_latency():
+    """Observed latency percentiles per Gemini model"""
+    return jsonify({"success": True, "models": model_router.tracker.snapshot()})
+
 @app.route('/api/transcribe', methods=['POST'])
 def transcribe_audio():
     """
@@ -53,15 +72,20 @@ def transcribe_audio():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/assistant', methods=['POST'])
-def ask_assistant():
+@app.route('/api/meeting/<meeting_id>/assistant', methods=['POST'])
+def ask_assistant(meeting_id=None):
     """
     Ask AI Assistant a question
     Expects: { "message": "user message", "context": ["previous", "messages"] }
     """
+    reply_id = uuid.uuid4().hex
+    
     try:
         data = request.json
         user_message = data.get('message', '')
         context = data.get('context', [])
+        meeting_id = meeting_id or data.get('meeting_id', DEFAULT_MEETING_ID)
+        client_id = data.get('client_id')
         
         if not user_message:
             return jsonify({"error": "No message provided"}), 400
@@ -77,31 +101,116 @@ def ask_assistant():
         
         prompt += f"User: {user_message}\n\nAssistant:"
         
-        # Generate response using Gemini
-        response = gemini_client.models.generate_content(
-            model='gemini-2.0-flash-exp',
-            contents=prompt
-        )
+        # Generate response using Gemini, pushing tokens to subscribers as they arrive
+        event_hub.publish(meeting_id, 'assistant_start', {"reply_id": reply_id, "client_id": client_id}, replay=False)
+        
+        chunks = []
+        try:
+            for text in model_router.stream(prompt, task='chat'):
+                chunks.append(text)
+                event_hub.publish(meeting_id, 'assistant_token', {"reply_id": reply_id, "text": text}, replay=False)
+        except Exception as e:
+            # Let every viewer close its in-progress reply, not just the caller
+            event_hub.publish(meeting_id, 'assistant_error', {
+                "reply_id": reply_id,
+                "error": str(e),
+                "client_id": client_id,
+            })
+            raise
         
-        ai_response = response.text
+        ai_response = "".join(chunks)
+        
+        event_hub.publish(meeting_id, 'assistant_message', {
+            "reply_id": reply_id,
+            "sender": "AI Assistant",
+            "text": ai_response,
+            "client_id": client_id,
+        })
         
         # Store in meeting context
-        meeting_context.append(f"User: {user_message}")
-        meeting_context.append(f"Assistant: {ai_response}")
+        state.append_messages(meeting_id, [
+            f"User: {user_message}",
+            f"Assistant: {ai_response}",
+        ])
         
         return jsonify({
             "success": True,
+            "reply_id": reply_id,
             "response": ai_response
         })
         
     except Exception as e:
         print(f"Error in assistant: {e}")
-        return jsonify({"error": str(e)}), 500
+        return jsonify({"error": str(e), "reply_id": reply_id}), 500
+
+@app.route('/api/meeting/<meeting_id>/events', methods=['GET'])
+def meeting_events(meeting_id):
+    """
+    Server-Sent Events stream of live meeting updates
+    Events: transcript, assistant_start, assistant_token, assistant_message, assistant_error, summary
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    
+    subscription = event_hub.subscribe(meeting_id, last_event_id)
+    
+    return Response(
+        stream_with_context(stream_events(event_hub, subscription)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # Disable proxy buffering (nginx)
+        }
+    )
+
+@app.route('/api/meeting/<meeting_id>/transcript', methods=['POST'])
+def post_transcript(meeting_id):
+    """
+    Broadcast a new transcript line to everyone in the meeting
+    Expects: { "text": "transcript line", "sender": "name", "client_id": "optional" }
+    """
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
+    
+    text = data.get('text')
+    sender = data.get('sender', 'Unknown')
+    client_id = data.get('client_id')
+    
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({"error": "No transcript text provided"}), 400
+    if len(text) > Config.MAX_TRANSCRIPT_CHARS:
+        return jsonify({"error": f"Transcript text exceeds {Config.MAX_TRANSCRIPT_CHARS} characters"}), 400
+    if not isinstance(sender, str) or (client_id is not None and not isinstance(client_id, str)):
+        return jsonify({"error": "sender and client_id must be strings"}), 400
+    
+    delivered = event_hub.publish(meeting_id, 'transcript', {
+        "sender": sender[:100],
+        "text": text.strip(),
+        "client_id": client_id,
+    })
+    
+    return jsonify({"success": True, "delivered": delivered})
 
 @app.route('/api/meeting/summary', methods=['GET'])
-def get_meeting_summary():
+@app.route('/api/meeting/<meeting_id>/summary', methods=['GET'])
+def get_meeting_summary(meeting_id=None):
     """Get AI-generated summary of the meeting"""
     try:
+        meeting_id = meeting_id or request.args.get('meeting_id', DEFAULT_MEETING_ID)
+        
+        # Reuse the stored summary if the conversation hasn't changed since
+        version = state.get_version(meeting_id)
+        summary, summary_version = state.get_summary(meeting_id)
+        if summary is not None and summary_version == version:
+            return jsonify({
+                "success": True,
+                "summary": summary
+            })
+        
+        meeting_context = state.get_messages(meeting_id)
+        
         if not meeting_context:
             return jsonify({
                 "success": True,
@@ -119,14 +228,14 @@ Provide:
 3. Action items (if any)
 """
         
-        response = gemini_client.models.generate_content(
-            model='gemini-2.0-flash-exp',
-            contents=prompt
-        )
+        summary = model_router.generate(prompt, task='summary')
+        state.set_summary(meeting_id, summary, version)
+        
+        event_hub.publish(meeting_id, 'summary', {"summary": summary})
         
         return jsonify({
             "success": True,
-            "summary": response.text
+            "summary": summary
         })
         
     except Exception as e:
@@ -137,7 +246,10 @@ if __name__ == '__main__':
     print(f"📡 Gemini API Key: {'✅ Set' if os.getenv('GEMINI_API_KEY') else '❌ Missing'}")
     print("🌐 Server running on http://localhost:5000")
     print("💡 Endpoints:")
-    print("   - POST /api/assistant - Ask AI assistant")
-    print("   - GET  /api/meeting/summary - Get meeting summary")
+    print("   - POST /api/meeting/<id>/assistant - Ask AI assistant")
+    print("   - GET  /api/meeting/<id>/summary - Get meeting summary")
     print("   - POST /api/transcribe - Transcribe audio")
-    app.run(debug=True, port=5000, host='0.0.0.0')
+    print("   - GET  /api/meeting/<id>/events - Live meeting events (SSE)")
+    print("   - POST /api/meeting/<id>/transcript - Broadcast transcript line")
+    print("   - GET  /api/models/latency - Model latency percentiles")
+    app.run(debug=True, port=5000, host='0.0.0.0', threaded=True)
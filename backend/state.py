@@ -0,0 +1,273 @@
+"""
+Meeting state backends (conversation context + summaries) shared across server workers
+"""
+
+import json
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+from config import Config
+
+try:
+    import redis
+except ImportError:  # Only needed for STATE_BACKEND=redis
+    redis = None
+
+# Raised when a WATCHed key changes before EXEC
+WATCH_ERRORS = (redis.WatchError,) if redis is not None else ()
+
+
+class StateBackend:
+    """
+    Interface for storing per-meeting conversation context and summaries
+    """
+
+    def append_messages(self, meeting_id, messages):
+        """Append messages to a meeting's rolling context window"""
+        raise NotImplementedError
+
+    def get_messages(self, meeting_id):
+        """Return the meeting's context messages, oldest first"""
+        raise NotImplementedError
+
+    def get_version(self, meeting_id):
+        """
+        Opaque token that changes on every context write and never repeats,
+        used to tell if a summary is stale. None if the meeting has no context.
+        """
+        raise NotImplementedError
+
+    def set_summary(self, meeting_id, summary, version):
+        """Store the latest summary and the context version it was generated from"""
+        raise NotImplementedError
+
+    def get_summary(self, meeting_id):
+        """Return (summary, version), or (None, None) if there is none"""
+        raise NotImplementedError
+
+
+class InMemoryStateBackend(StateBackend):
+    """
+    Process-local state - only correct with a single worker.
+    Meetings idle for longer than STATE_TTL are dropped, and at most STATE_MAX_MEETINGS
+    are kept (least recently written first out).
+    """
+
+    def __init__(self, max_messages=None, ttl=None, max_meetings=None):
+        self.max_messages = max_messages or Config.MAX_CONTEXT_MESSAGES
+        self.ttl = ttl or Config.STATE_TTL
+        self.max_meetings = max_meetings or Config.STATE_MAX_MEETINGS
+        self._meetings = OrderedDict()  # meeting_id -> meeting dict, least recently written first
+        self._lock = threading.Lock()
+
+    def _get(self, meeting_id):
+        """Live meeting record, or None if missing/expired. Caller holds the lock."""
+        meeting = self._meetings.get(meeting_id)
+        if meeting is not None and time.monotonic() - meeting['updated'] > self.ttl:
+            del self._meetings[meeting_id]
+            return None
+        return meeting
+
+    def append_messages(self, meeting_id, messages):
+        with self._lock:
+            meeting = self._get(meeting_id)
+            if meeting is None:
+                meeting = {'messages': [], 'version': 0, 'summary': (None, None)}
+
+            meeting['messages'].extend(messages)
+            del meeting['messages'][:-self.max_messages]
+            meeting['version'] += 1
+            meeting['updated'] = time.monotonic()
+
+            self._meetings[meeting_id] = meeting
+            self._meetings.move_to_end(meeting_id)
+            self._evict()
+
+    def _evict(self):
+        """Drop expired meetings and enforce max_meetings. Caller holds the lock."""
+        now = time.monotonic()
+        while self._meetings:
+            meeting_id, meeting = next(iter(self._meetings.items()))
+            if len(self._meetings) <= self.max_meetings and now - meeting['updated'] <= self.ttl:
+                break
+            del self._meetings[meeting_id]
+
+    def get_messages(self, meeting_id):
+        with self._lock:
+            meeting = self._get(meeting_id)
+            return list(meeting['messages']) if meeting else []
+
+    def get_version(self, meeting_id):
+        with self._lock:
+            meeting = self._get(meeting_id)
+            return meeting['version'] if meeting else None
+
+    def set_summary(self, meeting_id, summary, version):
+        with self._lock:
+            meeting = self._get(meeting_id)
+            if meeting is not None and meeting['version'] == version:
+                meeting['summary'] = (summary, version)
+
+    def get_summary(self, meeting_id):
+        with self._lock:
+            meeting = self._get(meeting_id)
+            return meeting['summary'] if meeting else (None, None)
+
+
+class RedisStateBackend(StateBackend):
+    """
+    Redis-backed state so any number of workers/nodes see the same conversation.
+
+    Meetings are sharded across the configured Redis servers by meeting ID and writes
+    for a request go out as a single pipeline. Context reads go through a bounded local
+    cache that is revalidated against the meeting's version, so an unchanged context
+    costs one small read instead of re-fetching the whole list.
+
+    Versions are "<generation>:<count>": the generation is picked when a meeting's keys
+    are first created, so a meeting ID reused after its keys expired never repeats an
+    old version. The summary lives in the same hash and expires with it.
+    """
+
+    def __init__(self, urls=None, clients=None, max_messages=None, ttl=None, cache_size=None):
+        if clients is None:
+            if redis is None:
+                raise ValueError("STATE_BACKEND=redis requires the 'redis' package (pip install redis)")
+            clients = [
+                redis.Redis.from_url(url, decode_responses=True)
+                for url in (urls or Config.REDIS_URLS)
+            ]
+
+        if not clients:
+            raise ValueError("At least one Redis URL is required for the Redis state backend")
+
+        self.clients = clients
+        self.max_messages = max_messages or Config.MAX_CONTEXT_MESSAGES
+        self.ttl = ttl or Config.STATE_TTL
+        self.cache_size = cache_size or Config.STATE_CACHE_SIZE
+        self._cache = OrderedDict()  # meeting_id -> (version, messages), least recently used first
+        self._lock = threading.Lock()
+
+    def _shard(self, meeting_id):
+        """Pick the Redis client that owns a meeting"""
+        return self.clients[zlib.crc32(meeting_id.encode('utf-8')) % len(self.clients)]
+
+    @staticmethod
+    def _context_key(meeting_id):
+        # Hash tag keeps a meeting's keys on one slot under Redis Cluster
+        return f"meeting:{{{meeting_id}}}:context"
+
+    @staticmethod
+    def _meta_key(meeting_id):
+        return f"meeting:{{{meeting_id}}}:meta"
+
+    @classmethod
+    def _version(cls, generation, count):
+        if generation is None or count is None:
+            return None
+        return f"{cls._decode(generation)}:{cls._decode(count)}"
+
+    @staticmethod
+    def _decode(value):
+        return value.decode('utf-8') if isinstance(value, bytes) else value
+
+    def append_messages(self, meeting_id, messages):
+        if not messages:
+            return
+
+        key = self._context_key(meeting_id)
+        meta_key = self._meta_key(meeting_id)
+
+        pipe = self._shard(meeting_id).pipeline(transaction=True)
+        pipe.rpush(key, *messages)
+        pipe.ltrim(key, -self.max_messages, -1)
+        pipe.hsetnx(meta_key, 'generation', uuid.uuid4().hex)
+        pipe.hincrby(meta_key, 'count', 1)
+        pipe.expire(key, self.ttl)
+        pipe.expire(meta_key, self.ttl)
+        pipe.execute()
+
+    def get_messages(self, meeting_id):
+        version = self.get_version(meeting_id)
+
+        with self._lock:
+            cached = self._cache.get(meeting_id)
+            if cached and version is not None and cached[0] == version:
+                self._cache.move_to_end(meeting_id)
+                return list(cached[1])
+            # Stale or expired - don't keep it around
+            self._cache.pop(meeting_id, None)
+
+        if version is None:
+            return []
+
+        # Read version and list together so the cache entry is labelled consistently
+        pipe = self._shard(meeting_id).pipeline(transaction=True)
+        pipe.hmget(self._meta_key(meeting_id), 'generation', 'count')
+        pipe.lrange(self._context_key(meeting_id), 0, -1)
+        (generation, count), values = pipe.execute()
+
+        version = self._version(generation, count)
+        messages = tuple(self._decode(value) for value in values)
+
+        if version is not None:
+            with self._lock:
+                self._cache[meeting_id] = (version, messages)
+                self._cache.move_to_end(meeting_id)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return list(messages)
+
+    def get_version(self, meeting_id):
+        generation, count = self._shard(meeting_id).hmget(self._meta_key(meeting_id), 'generation', 'count')
+        return self._version(generation, count)
+
+    def set_summary(self, meeting_id, summary, version):
+        if version is None:
+            return
+
+        meta_key = self._meta_key(meeting_id)
+        payload = json.dumps({"summary": summary, "version": version})
+
+        # Only attach the summary to the meeting it was generated for. WATCH makes the
+        # version check and the write atomic: if the meta hash expires or changes in
+        # between, EXEC fails instead of recreating the hash without a TTL.
+        pipe = self._shard(meeting_id).pipeline(transaction=True)
+        try:
+            pipe.watch(meta_key)
+            generation, count = pipe.hmget(meta_key, 'generation', 'count')
+            if self._version(generation, count) != version:
+                return
+
+            pipe.multi()
+            pipe.hset(meta_key, 'summary', payload)
+            pipe.expire(meta_key, self.ttl)
+            pipe.expire(self._context_key(meeting_id), self.ttl)
+            pipe.execute()
+        except WATCH_ERRORS:
+            pass  # Context changed meanwhile - this summary is already stale
+        finally:
+            pipe.reset()
+
+    def get_summary(self, meeting_id):
+        payload = self._shard(meeting_id).hget(self._meta_key(meeting_id), 'summary')
+        if payload is None:
+            return None, None
+
+        data = json.loads(self._decode(payload))
+        return data["summary"], data["version"]
+
+
+def create_state_backend(name=None):
+    """Build the state backend selected by STATE_BACKEND"""
+    name = (name or Config.STATE_BACKEND).lower()
+
+    if name == 'memory':
+        return InMemoryStateBackend()
+    if name == 'redis':
+        return RedisStateBackend()
+
+    raise ValueError(f"Unknown STATE_BACKEND: {name}")
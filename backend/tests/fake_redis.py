@@ -0,0 +1,175 @@
+"""
+In-process stand-in for the parts of the redis-py client the backend uses
+"""
+
+import copy
+
+
+class WatchError(Exception):
+    """Stand-in for redis.WatchError"""
+
+
+class FakeRedis:
+    """
+    Minimal redis-py lookalike. Values are stored as bytes like a client without
+    decode_responses. Pub/sub messages are delivered synchronously.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.commands = []
+        self.channels = {}         # channel -> list of handlers
+        self.after_watch_read = None  # test hook run between WATCH reads and MULTI
+
+    @staticmethod
+    def _encode(value):
+        return value if isinstance(value, bytes) else str(value).encode('utf-8')
+
+    def expire_all(self):
+        """Simulate every key with a TTL running out"""
+        for key in list(self.ttls):
+            self.data.pop(key, None)
+        self.ttls.clear()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+    def set(self, key, value, nx=False, ex=None):
+        self.commands.append('set')
+        if nx and key in self.data:
+            return None
+        self.data[key] = self._encode(value)
+        if ex is not None:
+            self.ttls[key] = ex
+        return True
+
+    def get(self, key):
+        self.commands.append('get')
+        return self.data.get(key)
+
+    def incr(self, key):
+        self.commands.append('incr')
+        self.data[key] = self._encode(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    def rpush(self, key, *values):
+        self.commands.append('rpush')
+        self.data.setdefault(key, []).extend(self._encode(v) for v in values)
+        return len(self.data[key])
+
+    def ltrim(self, key, start, end):
+        self.commands.append('ltrim')
+        values = self.data.get(key, [])
+        self.data[key] = values[start:] if end == -1 else values[start:end + 1]
+
+    def lrange(self, key, start, end):
+        self.commands.append('lrange')
+        values = self.data.get(key, [])
+        return list(values[start:] if end == -1 else values[start:end + 1])
+
+    def expire(self, key, seconds):
+        self.commands.append('expire')
+        if key in self.data:
+            self.ttls[key] = seconds
+
+    def hsetnx(self, key, field, value):
+        self.commands.append('hsetnx')
+        fields = self.data.setdefault(key, {})
+        if field in fields:
+            return 0
+        fields[field] = self._encode(value)
+        return 1
+
+    def hincrby(self, key, field, amount):
+        self.commands.append('hincrby')
+        fields = self.data.setdefault(key, {})
+        fields[field] = self._encode(int(fields.get(field, 0)) + amount)
+        return int(fields[field])
+
+    def hset(self, key, field, value):
+        self.commands.append('hset')
+        self.data.setdefault(key, {})[field] = self._encode(value)
+
+    def hget(self, key, field):
+        self.commands.append('hget')
+        return self.data.get(key, {}).get(field)
+
+    def hmget(self, key, *fields):
+        self.commands.append('hmget')
+        values = self.data.get(key, {})
+        return [values.get(field) for field in fields]
+
+    def publish(self, channel, message):
+        self.commands.append('publish')
+        handlers = list(self.channels.get(channel, ()))
+        for handler in handlers:
+            handler({'type': 'message', 'channel': channel, 'data': message})
+        return len(handlers)
+
+
+class FakePipeline:
+    """Queues commands; between watch() and multi() commands run immediately"""
+
+    def __init__(self, client):
+        self.client = client
+        self.queued = []
+        self.watched = None
+        self.immediate = False
+
+    def watch(self, *keys):
+        self.watched = {key: copy.deepcopy(self.client.data.get(key)) for key in keys}
+        self.immediate = True
+
+    def multi(self):
+        if self.client.after_watch_read is not None:
+            self.client.after_watch_read()
+        self.immediate = False
+
+    def reset(self):
+        self.queued = []
+        self.watched = None
+        self.immediate = False
+
+    def __getattr__(self, name):
+        command = getattr(self.client, name)
+
+        def run(*args, **kwargs):
+            if self.immediate:
+                return command(*args, **kwargs)
+            self.queued.append((name, args, kwargs))
+            return self
+        return run
+
+    def execute(self):
+        self.client.commands.append('execute')
+        queued, self.queued = self.queued, []
+        if self.watched is not None:
+            for key, value in self.watched.items():
+                if self.client.data.get(key) != value:
+                    raise WatchError(key)
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in queued]
+
+
+class FakePubSub:
+    def __init__(self, client):
+        self.client = client
+        self.handlers = {}
+
+    def subscribe(self, **handlers):
+        for channel, handler in handlers.items():
+            if channel not in self.handlers:
+                self.client.channels.setdefault(channel, []).append(handler)
+            self.handlers[channel] = handler
+
+    def unsubscribe(self, *channels):
+        for channel in channels:
+            handler = self.handlers.pop(channel, None)
+            if handler is not None:
+                self.client.channels[channel].remove(handler)
+
+    def run_in_thread(self, sleep_time=0, daemon=False):
+        return None
@@ -0,0 +1,200 @@
+"""
+Tests for the SSE event hub
+"""
+
+import threading
+import time
+
+from events import EventHub, RedisEventHub, format_sse, stream_events
+from fake_redis import FakeRedis
+
+
+def test_publish_fans_out_to_every_subscriber():
+    hub = EventHub(max_buffer=10, replay_size=10)
+    first = hub.subscribe('meeting')
+    second = hub.subscribe('meeting')
+    other = hub.subscribe('other-meeting')
+
+    delivered = hub.publish('meeting', 'transcript', {"text": "hello"})
+
+    assert delivered == 2
+    assert first.get(timeout=0)['data'] == {"text": "hello"}
+    assert second.get(timeout=0)['data'] == {"text": "hello"}
+    assert other.get(timeout=0) is None
+
+
+def test_event_ids_increase_per_meeting():
+    hub = EventHub(max_buffer=10, replay_size=10)
+    subscription = hub.subscribe('meeting')
+
+    hub.publish('meeting', 'transcript', {})
+    hub.publish('meeting', 'transcript', {})
+
+    assert [subscription.get(timeout=0)['id'] for _ in range(2)] == [1, 2]
+
+
+def test_slow_consumer_is_dropped_on_overflow():
+    hub = EventHub(max_buffer=2, replay_size=2)
+    slow = hub.subscribe('meeting')
+    fast = hub.subscribe('meeting')
+
+    for i in range(3):
+        hub.publish('meeting', 'transcript', {"i": i})
+        fast.get(timeout=0)
+
+    assert slow.closed and slow.overflowed
+    assert not fast.closed
+    assert hub.subscriber_count('meeting') == 1
+
+
+def test_last_event_id_replays_missed_events():
+    hub = EventHub(max_buffer=10, replay_size=10)
+    for i in range(4):
+        hub.publish('meeting', 'transcript', {"i": i})
+
+    subscription = hub.subscribe('meeting', last_event_id=2)
+
+    assert [subscription.get(timeout=0)['id'] for _ in range(2)] == [3, 4]
+    assert subscription.get(timeout=0) is None
+
+
+def test_non_replayable_events_are_not_kept():
+    hub = EventHub(max_buffer=10, replay_size=10)
+    hub.publish('meeting', 'assistant_token', {"text": "tok"}, replay=False)
+
+    subscription = hub.subscribe('meeting', last_event_id=0)
+
+    assert subscription.get(timeout=0) is None
+
+
+def test_replay_is_clamped_to_subscriber_buffer():
+    hub = EventHub(max_buffer=2, replay_size=5)
+    for i in range(5):
+        hub.publish('meeting', 'transcript', {"i": i})
+
+    subscription = hub.subscribe('meeting', last_event_id=0)
+
+    assert not subscription.closed
+    assert [subscription.get(timeout=0)['id'] for _ in range(2)] == [4, 5]
+
+
+def test_format_sse():
+    frame = format_sse({'id': 7, 'type': 'summary', 'data': {"summary": "done"}})
+
+    assert frame == 'id: 7\nevent: summary\ndata: {"summary": "done"}\n\n'
+
+
+def test_stream_events_sends_heartbeat_when_idle():
+    hub = EventHub(max_buffer=10, replay_size=10)
+    subscription = hub.subscribe('meeting')
+    frames = stream_events(hub, subscription, heartbeat=0.01)
+
+    assert next(frames) == "retry: 2000\n\n"
+    assert next(frames) == ": keepalive\n\n"
+
+    hub.publish('meeting', 'transcript', {"text": "hi"})
+    assert next(frames).startswith("id: 1\nevent: transcript\n")
+
+    frames.close()
+    assert hub.subscriber_count('meeting') == 0
+
+
+def test_stream_events_stops_when_subscription_closes():
+    hub = EventHub(max_buffer=10, replay_size=10)
+    subscription = hub.subscribe('meeting')
+    frames = stream_events(hub, subscription, heartbeat=5)
+    next(frames)
+
+    threading.Timer(0.05, subscription.close).start()
+
+    assert list(frames) == []
+    assert hub.subscriber_count('meeting') == 0
+
+
+def test_idle_meetings_without_subscribers_are_evicted():
+    hub = EventHub(max_buffer=10, replay_size=10, idle_seconds=0.01)
+    hub.subscribe('watched')
+    hub.publish('watched', 'transcript', {})
+    hub.publish('abandoned', 'transcript', {})
+
+    time.sleep(0.02)
+    hub.publish('fresh', 'transcript', {})
+
+    assert hub.tracked_meetings() == 2
+    assert hub.subscribe('abandoned', last_event_id=0).get(timeout=0) is None
+    assert hub.subscribe('watched', last_event_id=0).get(timeout=0)['id'] == 1
+
+
+def test_tracked_meetings_are_capped():
+    hub = EventHub(max_buffer=10, replay_size=10, max_meetings=3)
+
+    for i in range(10):
+        hub.publish(f"meeting-{i}", 'transcript', {"i": i})
+
+    assert hub.tracked_meetings() == 3
+    assert hub.subscribe('meeting-9', last_event_id=0).get(timeout=0)['data'] == {"i": 9}
+
+
+def test_event_ids_keep_increasing_after_eviction():
+    hub = EventHub(max_buffer=10, replay_size=10, max_meetings=1)
+    hub.publish('meeting', 'transcript', {})
+    hub.publish('other', 'transcript', {})
+
+    subscription = hub.subscribe('meeting', last_event_id=1)
+    hub.publish('meeting', 'transcript', {})
+
+    assert subscription.get(timeout=0)['id'] == 3
+
+
+def make_redis_hubs(count=2, shard=None, **kwargs):
+    shard = shard or FakeRedis()
+    kwargs.setdefault('max_buffer', 10)
+    kwargs.setdefault('replay_size', 10)
+    return [RedisEventHub(clients=[shard], **kwargs) for _ in range(count)], shard
+
+
+def test_redis_hub_fans_out_across_workers():
+    (publisher, listener), _ = make_redis_hubs()
+    local = publisher.subscribe('meeting')
+    remote = listener.subscribe('meeting')
+
+    delivered = publisher.publish('meeting', 'transcript', {"text": "hello"})
+
+    assert delivered == 2
+    assert local.get(timeout=0)['data'] == {"text": "hello"}
+    assert remote.get(timeout=0)['data'] == {"text": "hello"}
+
+
+def test_redis_hub_ids_are_shared_and_replay_works_on_any_worker():
+    (first, second), _ = make_redis_hubs()
+    for i, hub in enumerate((first, second, first)):
+        hub.publish('meeting', 'transcript', {"i": i})
+
+    events = second._replay('meeting', 0)
+    assert [event['data'] for event in events] == [{"i": 0}, {"i": 1}, {"i": 2}]
+    assert events[0]['id'] < events[1]['id'] < events[2]['id']
+
+    # Reconnect to the other worker with the id of the first event
+    subscription = first.subscribe('meeting', last_event_id=events[0]['id'])
+    assert [subscription.get(timeout=0)['data'] for _ in range(2)] == [{"i": 1}, {"i": 2}]
+
+
+def test_redis_hub_stops_listening_without_local_subscribers():
+    (publisher, listener), shard = make_redis_hubs()
+    subscription = listener.subscribe('meeting')
+    listener.unsubscribe(subscription)
+
+    assert publisher.publish('meeting', 'transcript', {}) == 0
+    assert shard.channels["meeting:{meeting}:events"] == []
+
+
+def test_redis_hub_ids_keep_increasing_after_counter_expires():
+    (hub,), shard = make_redis_hubs(count=1)
+    hub.publish('meeting', 'transcript', {})
+    last_id = hub._replay('meeting', 0)[-1]['id']
+
+    shard.expire_all()
+    hub.publish('meeting', 'transcript', {})
+
+    subscription = hub.subscribe('meeting', last_event_id=last_id)
+    assert subscription.get(timeout=0)['id'] > last_id
@@ -0,0 +1,284 @@
+"""
+Tests for latency-aware model routing and hedging
+"""
+
+import threading
+import time
+
+import pytest
+
+from model_router import LatencyTracker, ModelRouter
+
+FAST = 'fast-model'
+STANDARD = 'standard-model'
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeStream:
+    """Iterator over response chunks that remembers whether it was closed"""
+
+    def __init__(self, texts, delay=0):
+        self.texts = list(texts)
+        self.delay = delay
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.closed or not self.texts:
+            raise StopIteration
+        time.sleep(self.delay)
+        return FakeResponse(self.texts.pop(0))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeModels:
+    """Stand-in for client.models with per-model delays and failures"""
+
+    def __init__(self, delays=None, failures=(), chunk_delay=0):
+        self.delays = delays or {}
+        self.failures = set(failures)
+        self.chunk_delay = chunk_delay
+        self.calls = []
+        self.timeouts = []
+        self.streams = {}
+
+    def _wait(self, model, config):
+        # Honour the per-request HTTP timeout like the real client does
+        timeout = config['http_options']['timeout'] / 1000
+        self.calls.append(model)
+        self.timeouts.append(timeout)
+
+        delay = self.delays.get(model, 0)
+        time.sleep(min(delay, timeout))
+        if delay > timeout:
+            raise TimeoutError(f"{model} request timed out")
+        if model in self.failures:
+            raise RuntimeError(f"{model} failed")
+
+    def generate_content(self, model, contents, config):
+        self._wait(model, config)
+        return FakeResponse(f"{model}: {contents}")
+
+    def generate_content_stream(self, model, contents, config):
+        self._wait(model, config)
+        stream = FakeStream([f"{model}:", " a", " b"], delay=self.chunk_delay)
+        self.streams[model] = stream
+        return stream
+
+
+class FakeClient:
+    def __init__(self, models):
+        self.models = models
+
+
+def make_router(models, tracker=None, deadlines=None):
+    return ModelRouter(
+        FakeClient(models),
+        tiers={'fast': FAST, 'standard': STANDARD},
+        routes={'chat': ('fast', 'standard'), 'summary': ('standard', 'fast')},
+        deadlines=deadlines or {'chat': 2, 'summary': 2},
+        tracker=tracker or LatencyTracker(min_samples=1),
+        workers=4,
+    )
+
+
+def seed(tracker, key, seconds, count=5):
+    for _ in range(count):
+        tracker.record(key, seconds)
+
+
+def test_percentile_needs_min_samples():
+    tracker = LatencyTracker(window=100, min_samples=5)
+    key = (FAST, 'chat', 'generate')
+
+    for value in (1, 2, 3, 4):
+        tracker.record(key, value)
+    assert tracker.percentile(key, 95) is None
+
+    tracker.record(key, 5)
+    assert tracker.percentile(key, 50) == 3
+    assert tracker.percentile(key, 95) == 5
+    assert tracker.percentile(key, 0) == 1
+
+
+def test_percentile_over_window():
+    tracker = LatencyTracker(window=100, min_samples=1)
+    key = (FAST, 'chat', 'generate')
+
+    for value in range(1, 101):
+        tracker.record(key, value)
+
+    assert tracker.percentile(key, 50) == 51
+    assert tracker.percentile(key, 95) == 95
+    assert tracker.percentile(key, 99) == 99
+
+
+def test_latency_is_tracked_per_task_and_mode():
+    tracker = LatencyTracker(min_samples=1)
+    seed(tracker, (FAST, 'summary', 'generate'), 20)
+
+    assert tracker.percentile((FAST, 'chat', 'stream'), 95) is None
+    assert tracker.percentile((FAST, 'summary', 'generate'), 95) == 20
+
+
+def test_primary_answers_without_hedge():
+    models = FakeModels()
+    router = make_router(models)
+
+    assert router.generate('hi', task='chat') == f"{FAST}: hi"
+    assert models.calls == [FAST]
+
+
+def test_hedge_fires_after_p95_and_first_answer_wins():
+    tracker = LatencyTracker(min_samples=1)
+    seed(tracker, (FAST, 'chat', 'generate'), 0.05)
+    models = FakeModels(delays={FAST: 1, STANDARD: 0})
+    router = make_router(models, tracker=tracker)
+
+    start = time.monotonic()
+    result = router.generate('hi', task='chat')
+
+    assert result == f"{STANDARD}: hi"
+    assert models.calls == [FAST, STANDARD]
+    assert time.monotonic() - start < 0.5
+
+
+def test_primary_failure_falls_back_immediately():
+    models = FakeModels(failures={FAST})
+    router = make_router(models)
+
+    assert router.generate('hi', task='chat') == f"{STANDARD}: hi"
+    assert router.tracker.snapshot()[f"{FAST}/chat/generate"]["errors"] == 1
+
+
+def test_all_models_failing_raises_last_error():
+    models = FakeModels(failures={FAST, STANDARD})
+    router = make_router(models)
+
+    with pytest.raises(RuntimeError):
+        router.generate('hi', task='chat')
+
+
+def test_deadline_raises_timeout():
+    models = FakeModels(delays={FAST: 1, STANDARD: 1})
+    router = make_router(models)
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        router.generate('hi', task='chat', deadline=0.1)
+    assert time.monotonic() - start < 0.5
+
+
+def test_route_swaps_when_primary_p95_exceeds_deadline():
+    tracker = LatencyTracker(min_samples=1)
+    router = make_router(FakeModels(), tracker=tracker, deadlines={'chat': 2, 'summary': 10})
+
+    assert router.route('summary') == (STANDARD, FAST)
+
+    seed(tracker, (STANDARD, 'summary', 'generate'), 15)
+    seed(tracker, (FAST, 'summary', 'generate'), 5)
+    assert router.route('summary') == (FAST, STANDARD)
+
+    # Other tasks and modes are unaffected
+    assert router.route('summary', mode='stream') == (STANDARD, FAST)
+    assert router.route('chat') == (FAST, STANDARD)
+
+
+def test_stream_yields_all_chunks():
+    router = make_router(FakeModels())
+
+    assert "".join(router.stream('hi', task='chat')) == f"{FAST}: a b"
+
+
+def test_stream_closes_losing_hedge():
+    tracker = LatencyTracker(min_samples=1)
+    seed(tracker, (FAST, 'chat', 'stream'), 0.05)
+    models = FakeModels(delays={FAST: 0.3, STANDARD: 0})
+    router = make_router(models, tracker=tracker)
+
+    assert "".join(router.stream('hi', task='chat')) == f"{STANDARD}: a b"
+
+    # Wait for the slow primary to finish in the background
+    deadline = time.monotonic() + 2
+    while FAST not in models.streams and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert models.streams[FAST].closed
+
+
+def test_stream_deadline_covers_whole_stream():
+    models = FakeModels(chunk_delay=0.5)
+    router = make_router(models)
+
+    chunks = router.stream('hi', task='chat', deadline=0.2)
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        list(chunks)
+    assert time.monotonic() - start < 1
+
+
+def test_latency_includes_queue_time():
+    tracker = LatencyTracker(min_samples=1)
+    models = FakeModels(delays={FAST: 0.2})
+    router = ModelRouter(
+        FakeClient(models),
+        tiers={'fast': FAST, 'standard': FAST},
+        routes={'chat': ('fast', None)},
+        deadlines={'chat': 5},
+        tracker=tracker,
+        workers=1,
+    )
+
+    threads = [threading.Thread(target=router.generate, args=('hi',)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # The second call waited ~0.2s for the single worker before running
+    assert tracker.percentile((FAST, 'chat', 'generate'), 100) >= 0.35
+
+
+def test_remaining_deadline_is_passed_to_the_client():
+    models = FakeModels()
+    router = make_router(models)
+
+    router.generate('hi', task='chat', deadline=1.5)
+
+    assert 1.0 < models.timeouts[0] <= 1.5
+
+
+def test_hung_calls_do_not_exhaust_the_pool():
+    models = FakeModels(delays={FAST: 60, STANDARD: 60})
+    router = make_router(models)
+
+    for _ in range(10):
+        with pytest.raises(TimeoutError):
+            router.generate('hi', task='chat', deadline=0.1)
+
+    time.sleep(0.1)
+    assert router._primary_pool._work_queue.qsize() == 0
+    assert router._hedge_pool._work_queue.qsize() == 0
+
+    models.delays = {}
+    assert router.generate('hi', task='chat') == f"{FAST}: hi"
+
+
+def test_hedge_is_capped_by_deadline():
+    tracker = LatencyTracker(min_samples=1)
+    # Primary p95 is longer than the whole deadline
+    seed(tracker, (FAST, 'chat', 'generate'), 5)
+    seed(tracker, (STANDARD, 'chat', 'generate'), 5)
+    models = FakeModels(delays={FAST: 2, STANDARD: 0})
+    router = make_router(models, tracker=tracker, deadlines={'chat': 0.4, 'summary': 2})
+
+    assert router.generate('hi', task='chat') == f"{STANDARD}: hi"
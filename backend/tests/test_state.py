@@ -0,0 +1,212 @@
+"""
+Tests for meeting state backends, using an in-process stand-in for Redis
+"""
+
+import time
+import zlib
+
+import pytest
+
+import state
+from fake_redis import FakeRedis, WatchError
+from state import InMemoryStateBackend, RedisStateBackend, create_state_backend
+
+
+def make_backend(shards=None, **kwargs):
+    shards = shards or [FakeRedis()]
+    return RedisStateBackend(clients=shards, **kwargs), shards
+
+
+def test_in_memory_backend_caps_context():
+    backend = InMemoryStateBackend(max_messages=2)
+    backend.append_messages('m', ['a', 'b', 'c'])
+
+    assert backend.get_messages('m') == ['b', 'c']
+    assert backend.get_version('m') == 1
+    assert backend.get_summary('m') == (None, None)
+
+
+def test_create_state_backend_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        create_state_backend('sqlite')
+
+
+def test_meetings_are_sharded_by_id():
+    backend, shards = make_backend([FakeRedis(), FakeRedis(), FakeRedis()])
+
+    for meeting_id in ('alpha', 'beta', 'gamma', 'delta'):
+        backend.append_messages(meeting_id, ['hello'])
+        owner = shards[zlib.crc32(meeting_id.encode('utf-8')) % 3]
+        assert f"meeting:{{{meeting_id}}}:context" in owner.data
+        for shard in shards:
+            if shard is not owner:
+                assert f"meeting:{{{meeting_id}}}:context" not in shard.data
+
+
+def test_writes_are_pipelined_and_capped():
+    backend, (shard,) = make_backend(max_messages=3)
+
+    for i in range(5):
+        backend.append_messages('m', [f"msg {i}"])
+
+    assert shard.commands.count('execute') == 5
+    assert backend.get_messages('m') == ['msg 2', 'msg 3', 'msg 4']
+
+
+def test_workers_share_context():
+    shard = FakeRedis()
+    first, _ = make_backend([shard])
+    second, _ = make_backend([shard])
+
+    first.append_messages('m', ['User: hi', 'Assistant: hello'])
+
+    assert second.get_messages('m') == ['User: hi', 'Assistant: hello']
+
+
+def test_unchanged_context_is_served_from_cache():
+    backend, (shard,) = make_backend()
+    backend.append_messages('m', ['a'])
+    backend.get_messages('m')
+
+    shard.commands.clear()
+    assert backend.get_messages('m') == ['a']
+    assert shard.commands == ['hmget']
+
+
+def test_cache_revalidates_after_another_worker_writes():
+    shard = FakeRedis()
+    reader, _ = make_backend([shard])
+    writer, _ = make_backend([shard])
+
+    writer.append_messages('m', ['a'])
+    assert reader.get_messages('m') == ['a']
+
+    writer.append_messages('m', ['b'])
+    assert reader.get_messages('m') == ['a', 'b']
+
+
+def test_cache_is_bounded():
+    backend, _ = make_backend(cache_size=2)
+
+    for meeting_id in ('a', 'b', 'c'):
+        backend.append_messages(meeting_id, ['x'])
+        backend.get_messages(meeting_id)
+
+    assert list(backend._cache) == ['b', 'c']
+
+
+def test_summary_reused_until_context_changes():
+    backend, _ = make_backend()
+    backend.append_messages('m', ['a'])
+
+    version = backend.get_version('m')
+    backend.set_summary('m', 'summary of a', version)
+    assert backend.get_summary('m') == ('summary of a', version)
+
+    backend.append_messages('m', ['b'])
+    summary, summary_version = backend.get_summary('m')
+    assert summary == 'summary of a'
+    assert summary_version != backend.get_version('m')
+
+
+def test_stale_summary_is_not_stored():
+    backend, _ = make_backend()
+    backend.append_messages('m', ['a'])
+    version = backend.get_version('m')
+    backend.append_messages('m', ['b'])
+
+    backend.set_summary('m', 'summary of a', version)
+
+    assert backend.get_summary('m') == (None, None)
+
+
+def test_expired_meeting_never_serves_old_state():
+    backend, (shard,) = make_backend()
+
+    backend.append_messages('demo-meeting', ['old conversation'])
+    old_version = backend.get_version('demo-meeting')
+    backend.set_summary('demo-meeting', 'old summary', old_version)
+    assert backend.get_messages('demo-meeting') == ['old conversation']
+
+    shard.expire_all()
+    assert backend.get_version('demo-meeting') is None
+    assert backend.get_messages('demo-meeting') == []
+    assert backend.get_summary('demo-meeting') == (None, None)
+
+    # Reused meeting ID reaches the same write count as before
+    backend.append_messages('demo-meeting', ['new conversation'])
+
+    assert backend.get_version('demo-meeting') != old_version
+    assert backend.get_messages('demo-meeting') == ['new conversation']
+    assert backend.get_summary('demo-meeting') == (None, None)
+
+
+def test_expired_meeting_cache_entry_is_not_reused():
+    backend, (shard,) = make_backend()
+
+    backend.append_messages('demo-meeting', ['old conversation'])
+    assert backend.get_messages('demo-meeting') == ['old conversation']
+
+    # No reads while the keys are gone - the worker's cache still holds the old entry
+    shard.expire_all()
+    backend.append_messages('demo-meeting', ['new conversation'])
+
+    assert backend.get_messages('demo-meeting') == ['new conversation']
+
+
+def test_summary_write_is_dropped_if_context_changes_during_check(monkeypatch):
+    monkeypatch.setattr(state, 'WATCH_ERRORS', (WatchError,))
+    backend, (shard,) = make_backend()
+    backend.append_messages('m', ['a'])
+    version = backend.get_version('m')
+
+    # Another worker writes between the version check and EXEC
+    shard.after_watch_read = lambda: backend.append_messages('m', ['b'])
+    backend.set_summary('m', 'summary of a', version)
+
+    assert backend.get_summary('m') == (None, None)
+
+
+def test_summary_write_does_not_recreate_expired_meeting(monkeypatch):
+    monkeypatch.setattr(state, 'WATCH_ERRORS', (WatchError,))
+    backend, (shard,) = make_backend()
+    backend.append_messages('m', ['a'])
+    version = backend.get_version('m')
+
+    shard.after_watch_read = shard.expire_all
+    backend.set_summary('m', 'summary of a', version)
+
+    assert f"meeting:{{m}}:meta" not in shard.data
+
+
+def test_summary_write_refreshes_ttl():
+    backend, (shard,) = make_backend(ttl=60)
+    backend.append_messages('m', ['a'])
+    shard.ttls.clear()
+
+    backend.set_summary('m', 'summary of a', backend.get_version('m'))
+
+    assert shard.ttls == {"meeting:{m}:meta": 60, "meeting:{m}:context": 60}
+
+
+def test_in_memory_backend_expires_idle_meetings():
+    backend = InMemoryStateBackend(ttl=0.01)
+    backend.append_messages('m', ['a'])
+    backend.set_summary('m', 'summary of a', backend.get_version('m'))
+
+    time.sleep(0.02)
+
+    assert backend.get_messages('m') == []
+    assert backend.get_version('m') is None
+    assert backend.get_summary('m') == (None, None)
+
+
+def test_in_memory_backend_caps_meetings():
+    backend = InMemoryStateBackend(max_meetings=2)
+
+    for meeting_id in ('a', 'b', 'c'):
+        backend.append_messages(meeting_id, ['x'])
+    backend.append_messages('b', ['y'])
+    backend.append_messages('d', ['x'])
+
+    assert list(backend._meetings) == ['b', 'd']
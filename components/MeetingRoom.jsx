@@ -242,7 +242,7 @@ export default function MeetingRoom({ callId, onLeave }) {
 
       {/* Chat Panel */}
       <div className="bg-gray-800 rounded-lg overflow-hidden">
-        <TranscriptPanel />
+        <TranscriptPanel meetingId={callId} />
       </div>
     </div>
   );
@@ -2,13 +2,18 @@
 
 import { useState, useRef, useEffect, useCallback } from 'react';
 
-export default function TranscriptPanel() {
+const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:5000';
+
+export default function TranscriptPanel({ meetingId = 'demo-meeting' }) {
   const [messages, setMessages] = useState([]);
   const [inputText, setInputText] = useState('');
   const [isListening, setIsListening] = useState(false);
   const [interimText, setInterimText] = useState('');
   const [speechError, setSpeechError] = useState(null);
+  const [streamingReplies, setStreamingReplies] = useState({});
   const messagesEndRef = useRef(null);
+  const clientIdRef = useRef(Math.random().toString(36).slice(2));
+  const shownRepliesRef = useRef(new Set());
   const recognitionRef = useRef(null);
   const restartTimeoutRef = useRef(null);
 
@@ -29,37 +34,70 @@ export default function TranscriptPanel() {
     
     setMessages(prev => [...prev, newMessage]);
 
+    // Share the line with everyone else in the meeting
+    fetch(`${BACKEND_URL}/api/meeting/${meetingId}/transcript`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        text: newMessage.text,
+        sender,
+        client_id: clientIdRef.current
+      })
+    }).catch(() => {
+      // Backend offline - transcript stays local
+    });
+
     // Check for AI assistant trigger
     if (text.toLowerCase().includes('hey assistant')) {
       // Call backend AI assistant
       callAIAssistant(text);
     }
-  }, []);
+  }, [meetingId]);
+
+  // Stop showing an in-progress assistant reply
+  const endStreamingReply = (replyId) => {
+    setStreamingReplies(prev => {
+      if (!(replyId in prev)) return prev;
+      const { [replyId]: _, ...rest } = prev;
+      return rest;
+    });
+  };
+
+  // Show a finished assistant reply once, whether it arrives over the event stream or REST
+  const showAssistantReply = (replyId, text, id) => {
+    endStreamingReply(replyId);
+    if (shownRepliesRef.current.has(replyId)) return;
+    shownRepliesRef.current.add(replyId);
+
+    setMessages(prev => [...prev, {
+      id,
+      text,
+      sender: 'AI Assistant',
+      timestamp: new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })
+    }]);
+  };
 
   // Call backend AI assistant
   const callAIAssistant = async (userMessage) => {
     try {
-      const response = await fetch('http://localhost:5000/api/assistant', {
+      const response = await fetch(`${BACKEND_URL}/api/meeting/${meetingId}/assistant`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
           message: userMessage,
-          context: messages.map(m => `${m.sender}: ${m.text}`)
+          context: messages.map(m => `${m.sender}: ${m.text}`),
+          client_id: clientIdRef.current
         })
       });
 
       const data = await response.json();
       
       if (data.success) {
-        const aiResponse = {
-          id: Date.now() + 1,
-          text: data.response,
-          sender: 'AI Assistant',
-          timestamp: new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })
-        };
-        setMessages(prev => [...prev, aiResponse]);
+        // No-op if the reply was already pushed over the event stream
+        showAssistantReply(data.reply_id, data.response, `reply-${data.reply_id}`);
       } else {
         console.error('AI Assistant error:', data.error);
+        if (data.reply_id) endStreamingReply(data.reply_id);
         // Fallback response
         const aiResponse = {
           id: Date.now() + 1,
@@ -81,6 +119,60 @@ export default function TranscriptPanel() {
     }
   };
 
+  // Subscribe to live meeting events pushed by the backend
+  useEffect(() => {
+    if (typeof window === 'undefined' || !('EventSource' in window)) return;
+
+    const source = new EventSource(`${BACKEND_URL}/api/meeting/${meetingId}/events`);
+
+    const pushMessage = (event, text, sender) => {
+      setMessages(prev => [...prev, {
+        id: `event-${event.lastEventId}`,
+        text,
+        sender,
+        timestamp: new Date().toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' })
+      }]);
+    };
+
+    source.addEventListener('transcript', (event) => {
+      const data = JSON.parse(event.data);
+      if (data.client_id === clientIdRef.current) return;
+      pushMessage(event, data.text, data.sender);
+    });
+
+    // In-progress replies are keyed by reply id so concurrent questions don't mix
+    source.addEventListener('assistant_start', (event) => {
+      const data = JSON.parse(event.data);
+      if (shownRepliesRef.current.has(data.reply_id)) return;
+      setStreamingReplies(prev => ({ ...prev, [data.reply_id]: '' }));
+    });
+
+    source.addEventListener('assistant_token', (event) => {
+      const data = JSON.parse(event.data);
+      if (shownRepliesRef.current.has(data.reply_id)) return;
+      setStreamingReplies(prev => ({ ...prev, [data.reply_id]: (prev[data.reply_id] || '') + data.text }));
+    });
+
+    source.addEventListener('assistant_message', (event) => {
+      const data = JSON.parse(event.data);
+      showAssistantReply(data.reply_id, data.text, `reply-${data.reply_id}`);
+    });
+
+    source.addEventListener('assistant_error', (event) => {
+      const data = JSON.parse(event.data);
+      endStreamingReply(data.reply_id);
+    });
+
+    source.addEventListener('summary', (event) => {
+      const data = JSON.parse(event.data);
+      pushMessage(event, `📋 Meeting Summary\n\n${data.summary}`, 'AI Assistant');
+    });
+
+    return () => {
+      source.close();
+    };
+  }, [meetingId]);
+
   // Initialize speech recognition
   useEffect(() => {
     if (!isSpeechSupported) return;
@@ -179,7 +271,7 @@ export default function TranscriptPanel() {
   // Auto-scroll to bottom
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
-  }, [messages, interimText]);
+  }, [messages, interimText, streamingReplies]);
 
   const toggleListening = () => {
     if (!isSpeechSupported) {
@@ -284,7 +376,21 @@ export default function TranscriptPanel() {
               </span>
               <span className="text-gray-500 text-xs">{msg.timestamp}</span>
             </div>
-            <p className="text-white text-sm">{msg.text}</p>
+            <p className="text-white text-sm whitespace-pre-line">{msg.text}</p>
+          </div>
+        ))}
+        
+        {/* Assistant reply streaming in */}
+        {Object.entries(streamingReplies).map(([replyId, text]) => (
+          <div
+            key={replyId}
+            className="p-3 rounded-lg bg-purple-900/50 border border-purple-700 border-dashed"
+          >
+            <div className="flex items-center gap-2 mb-1">
+              <span className="w-2 h-2 bg-purple-400 rounded-full animate-pulse"></span>
+              <span className="text-sm font-medium text-purple-300">AI Assistant</span>
+            </div>
+            <p className="text-white text-sm">{text || '...'}</p>
           </div>
         ))}
         